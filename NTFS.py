@@ -1,12 +1,25 @@
 import struct
+import codecs
 import datetime
-from collections import namedtuple
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import logging
+import mmap
+import os
 import sys
 
 # Constants
 NTFS_SIGNATURE = b'NTFS    '
 SECTOR_SIZE = 512
+MFT_CHUNK_SIZE = 1024 * 1024  # Bytes of MFT read per I/O during a scan
+MFT_READ_AHEAD = 4  # Chunk reads kept in flight ahead of the parser during a scan
+NTFS_EPOCH = datetime.datetime(1601, 1, 1)  # NTFS timestamps count 100ns ticks from here
+MFT_RECORD_NUMBER = 0  # MFT record describing the MFT itself
+ROOT_RECORD_NUMBER = 5  # MFT record of the volume's root directory
+FILE_NAME_NAMESPACE_DOS = 2  # 8.3 short-name alias of a long name
+HAVE_PREADV = hasattr(os, 'preadv')  # Positional reads (not available on Windows)
+DIRECT_IO_ALIGNMENT = 4096  # Offset, size and address alignment for O_DIRECT reads
 ATTRIBUTE_TYPES = {
     0x10: 'STANDARD_INFORMATION',
     0x20: 'ATTRIBUTE_LIST',
@@ -25,9 +38,32 @@ ATTRIBUTE_TYPES = {
     0xF0: 'PROPERTY_SET',
     0x100: 'LOGGED_UTILITY_STREAM'
 }
+# Bit in NTFSFileEntry.attr_mask for each known attribute type
+ATTRIBUTE_BITS = {attr_type: bit for bit, attr_type in enumerate(ATTRIBUTE_TYPES)}
+
+# Precompiled layouts
+U16 = struct.Struct('<H')
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+# Boot sector from offset 3: OEM ID, bytes/sector, sectors/cluster, MFT cluster,
+# MFT mirror cluster, clusters per MFT record, volume serial, checksum
+BOOT_SECTOR_STRUCT = struct.Struct('<8sHB34xQQb7xQI')
+# Attribute header: type, length, (skipped), content length, content offset
+ATTRIBUTE_HEADER_STRUCT = struct.Struct('<II8xIH')
+# MFT record header: update sequence array offset and entry count
+FIXUP_HEADER_STRUCT = struct.Struct('<4xHH')
+# $STANDARD_INFORMATION timestamps read by parse_standard_information
+STANDARD_INFORMATION_TIMES_STRUCT = struct.Struct('<24xQQQ')
+# Non-resident attribute header: data run offset, real data size
+NONRESIDENT_HEADER_STRUCT = struct.Struct('<32xH14xQ')
+
+utf16le_decode = codecs.utf_16_le_decode  # Accepts memoryviews without a bytes copy
+
+# Column layout of print_files
+FILE_ROW_FORMAT = "{:<8} {:<50} {:<10} {:<20} {:<10}"
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Data structures
@@ -37,32 +73,91 @@ NTFSBootSector = namedtuple('NTFSBootSector', [
     'volume_serial', 'checksum'
 ])
 
+def ntfs_time_to_datetime(ntfs_time):
+    """Convert NTFS 64-bit time to Python datetime"""
+    if ntfs_time == 0:
+        return None
+    try:
+        return NTFS_EPOCH + datetime.timedelta(microseconds=ntfs_time//10)
+    except (OverflowError, ValueError):
+        return None
+
 class NTFSFileEntry:
+    __slots__ = ('name', 'name_namespace', 'size', 'created_time', 'modified_time',
+                 'accessed_time', 'attr_mask', 'other_attr_types', 'is_directory',
+                 'parent_ref', 'parent_name', 'record_number')
+
     def __init__(self):
         self.name = None
+        self.name_namespace = None  # FILE_NAME namespace the name was taken from
         self.size = 0
-        self.created = None
-        self.modified = None
-        self.accessed = None
-        self.attributes = []
+        # Raw NTFS timestamps; converted to datetime only when read
+        self.created_time = 0
+        self.modified_time = 0
+        self.accessed_time = 0
+        self.attr_mask = 0  # ATTRIBUTE_BITS bit set for each known attribute type present
+        self.other_attr_types = ()  # Unknown attribute types, in order of appearance
         self.is_directory = False
         self.parent_ref = None
+        self.parent_name = None
         self.record_number = -1
 
+    @property
+    def created(self):
+        return ntfs_time_to_datetime(self.created_time)
+
+    @property
+    def modified(self):
+        return ntfs_time_to_datetime(self.modified_time)
+
+    @property
+    def accessed(self):
+        return ntfs_time_to_datetime(self.accessed_time)
+
+    def add_attribute_type(self, attr_type):
+        """Record that the entry has an attribute of the given type"""
+        bit = ATTRIBUTE_BITS.get(attr_type)
+        if bit is not None:
+            self.attr_mask |= 1 << bit
+        elif attr_type not in self.other_attr_types:
+            self.other_attr_types += (attr_type,)
+
+    @property
+    def attributes(self):
+        """Names of the attribute types present in the record"""
+        names = [name for attr_type, name in ATTRIBUTE_TYPES.items()
+                 if self.attr_mask >> ATTRIBUTE_BITS[attr_type] & 1]
+        names.extend(f'UNKNOWN_{hex(attr_type)}' for attr_type in self.other_attr_types)
+        return names
+
     def __repr__(self):
         return (f"NTFSFileEntry(name={self.name}, size={self.size}, "
                 f"is_directory={self.is_directory}, record_number={self.record_number})")
 
 class NTFS:
-    def __init__(self, disk_path, partition_offset=0):
+    def __init__(self, disk_path, partition_offset=0, direct_io=False):
         self.disk_path = disk_path
+        # Name shown as the parent of files in the root directory
+        self.root_name = disk_path.rstrip('\\').split('\\')[-1] or disk_path
         self.partition_offset = partition_offset
+        self.direct_io = direct_io  # Bypass the OS cache (O_DIRECT) where supported
         self.disk = None
         self.boot_sector = None
         self.bytes_per_cluster = 0
         self.cluster_size = 0
+        self.mft_record_size = 0
+        self.mft_offset = 0  # Absolute byte offset of the MFT on the disk
         self.files = []
+        self.files_by_record = {}  # record_number -> NTFSFileEntry
+        self.mft_bitmap = None  # One bit per MFT record, set when in use
+        self.name_index = None  # Lowercase name trigram -> positions in self.files
         self.volume_serial = None
+        # Attribute type -> parser; other attribute types are only recorded
+        self.attribute_parsers = {
+            0x10: self.parse_standard_information,
+            0x30: self.parse_file_name,
+            0x80: self.parse_data,
+        }
         
     def __enter__(self):
         self.open()
@@ -74,8 +169,22 @@ class NTFS:
     def open(self):
         """Open the disk for reading"""
         try:
-            # Use binary mode with buffering=0 for raw disk access
-            self.disk = open(self.disk_path, 'rb', buffering=0)
+            if self.direct_io and hasattr(os, 'O_DIRECT'):
+                # A one-shot scan gains nothing from the page cache
+                try:
+                    fd = os.open(self.disk_path, os.O_RDONLY | os.O_DIRECT)
+                    self.disk = os.fdopen(fd, 'rb', buffering=0)
+                except OSError as e:
+                    if isinstance(e, PermissionError):
+                        raise
+                    logger.warning(f"O_DIRECT unavailable for {self.disk_path}, using cached reads: {e}")
+                    self.direct_io = False
+            else:
+                self.direct_io = False
+            
+            if not self.disk:
+                # Use binary mode with buffering=0 for raw disk access
+                self.disk = open(self.disk_path, 'rb', buffering=0)
             logger.info(f"Successfully opened {self.disk_path}")
             return True
         except PermissionError:
@@ -91,13 +200,38 @@ class NTFS:
             self.disk.close()
             self.disk = None
             
+    def allocate_buffer(self, size):
+        """Allocate a read buffer of at least `size` bytes; with direct I/O it is
+        page-aligned and padded to DIRECT_IO_ALIGNMENT"""
+        if not self.direct_io:
+            return bytearray(size)
+        return mmap.mmap(-1, -(-size // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT)
+
+    def read_into(self, buffer, offset):
+        """Fill buffer from an absolute disk offset and return the bytes read.
+        Uses positional reads where available, so concurrent readers do not
+        share a seek position."""
+        if self.direct_io and (offset % DIRECT_IO_ALIGNMENT
+                               or len(buffer) % DIRECT_IO_ALIGNMENT
+                               or not isinstance(buffer, mmap.mmap)):
+            # O_DIRECT rejects unaligned requests; go through an aligned bounce buffer
+            start = offset - offset % DIRECT_IO_ALIGNMENT
+            bounce = self.allocate_buffer(offset - start + len(buffer))
+            bytes_read = self.read_into(bounce, start) - (offset - start)
+            bytes_read = max(0, min(bytes_read, len(buffer)))
+            buffer[:bytes_read] = bounce[offset-start:offset-start+bytes_read]
+            return bytes_read
+        
+        if HAVE_PREADV:
+            return os.preadv(self.disk.fileno(), [buffer], offset)
+        self.disk.seek(offset)
+        return self.disk.readinto(buffer) or 0
+
     def read_boot_sector(self):
         """Read and parse the NTFS boot sector"""
         try:
-            self.disk.seek(self.partition_offset * SECTOR_SIZE)
-            data = self.disk.read(SECTOR_SIZE)
-            
-            if len(data) < 512:
+            data = bytearray(SECTOR_SIZE)
+            if self.read_into(data, self.partition_offset * SECTOR_SIZE) < SECTOR_SIZE:
                 raise ValueError("Couldn't read full boot sector")
             
             # Validate NTFS signature
@@ -105,12 +239,11 @@ class NTFS:
                 raise ValueError("Not a valid NTFS filesystem")
                 
             # Parse boot sector with better error checking
-            bytes_per_sector = struct.unpack('<H', data[11:13])[0]
+            (oem_id, bytes_per_sector, sectors_per_cluster, mft_cluster,
+             mft_mirror_cluster, mft_record_size_raw, volume_serial,
+             checksum) = BOOT_SECTOR_STRUCT.unpack_from(data, 3)
             if bytes_per_sector != 512 and bytes_per_sector != 4096:
                 raise ValueError(f"Unsupported sector size: {bytes_per_sector}")
-                
-            sectors_per_cluster = struct.unpack('<B', data[13:14])[0]
-            mft_record_size_raw = struct.unpack('<b', data[64:65])[0]
             
             # Calculate MFT record size (can be negative indicating power of 2)
             mft_record_size = (2 ** abs(mft_record_size_raw) 
@@ -118,14 +251,14 @@ class NTFS:
                              else mft_record_size_raw * 1024)
             
             self.boot_sector = NTFSBootSector(
-                oem_id=data[3:11].decode('ascii'),
+                oem_id=oem_id.decode('ascii'),
                 bytes_per_sector=bytes_per_sector,
                 sectors_per_cluster=sectors_per_cluster,
-                mft_cluster=struct.unpack('<Q', data[48:56])[0],
-                mft_mirror_cluster=struct.unpack('<Q', data[56:64])[0],
+                mft_cluster=mft_cluster,
+                mft_mirror_cluster=mft_mirror_cluster,
                 mft_record_size=mft_record_size,
-                volume_serial=struct.unpack('<Q', data[72:80])[0],
-                checksum=struct.unpack('<I', data[80:84])[0]
+                volume_serial=volume_serial,
+                checksum=checksum
             )
 
             self.bytes_per_cluster = (self.boot_sector.bytes_per_sector 
@@ -133,9 +266,12 @@ class NTFS:
             self.cluster_size = (self.boot_sector.sectors_per_cluster 
                                * self.boot_sector.bytes_per_sector)
             self.volume_serial = self.boot_sector.volume_serial
+            self.mft_record_size = mft_record_size
+            self.mft_offset = (self.partition_offset * SECTOR_SIZE
+                               + mft_cluster * self.bytes_per_cluster)
             
             logger.info("Successfully read NTFS boot sector")
-            logger.debug(f"Boot sector info: {self.boot_sector}")
+            logger.debug("Boot sector info: %s", self.boot_sector)
             return True
             
         except Exception as e:
@@ -145,33 +281,27 @@ class NTFS:
     def read_mft_record(self, record_number):
         """Read an MFT record from disk"""
         try:
-            # Calculate the byte offset to the MFT
-            mft_offset = self.boot_sector.mft_cluster * self.bytes_per_cluster
-            
             # Calculate the byte offset to the specific record
-            record_offset = record_number * self.boot_sector.mft_record_size
-            
-            # Combine with partition offset
-            absolute_offset = (self.partition_offset * SECTOR_SIZE 
-                              + mft_offset 
-                              + record_offset)
+            absolute_offset = self.mft_offset + record_number * self.mft_record_size
             
             # Ensure we don't try to seek beyond file limits
             if absolute_offset < 0:
                 raise ValueError(f"Invalid negative offset: {absolute_offset}")
             
-            absolute_offset = 33941504
-            # print (absolute_offset)
-            self.disk.seek(absolute_offset)
             # Read the MFT record
-            record_data = self.disk.read(self.boot_sector.mft_record_size)
+            record_data = bytearray(self.mft_record_size)
+            del record_data[self.read_into(record_data, absolute_offset):]
             
             if len(record_data) < 42:  # Minimum valid record size
-                logger.debug(f"Record {record_number} too small")
+                logger.debug("Record %d too small", record_number)
                 return None, 0
                 
             if record_data[0:4] != b'FILE':
-                # logger.debug(f"Record {record_number} missing FILE signature")
+                # logger.debug("Record %d missing FILE signature", record_number)
+                return None, 0
+            
+            if not self.apply_fixup(record_data):
+                logger.debug("Record %d failed update sequence check", record_number)
                 return None, 0
             return record_data, absolute_offset
             
@@ -179,41 +309,234 @@ class NTFS:
             logger.error(f"Error reading MFT record {record_number}: {e}")
             return None, 0
             
+    def read_mft_chunk(self, start_record, count, buffer=None):
+        """Read `count` consecutive MFT records with a single I/O, into `buffer`
+        if one is given (it must be at least that large, plus DIRECT_IO_ALIGNMENT
+        with direct I/O)"""
+        try:
+            record_size = self.mft_record_size
+            absolute_offset = self.mft_offset + start_record * record_size
+            size = count * record_size
+            # Direct I/O starts at the aligned block holding the range, so an
+            # unaligned partition does not fall back to a bounce buffer
+            lead = absolute_offset % DIRECT_IO_ALIGNMENT if self.direct_io else 0
+
+            if buffer is None:
+                buffer = self.allocate_buffer(lead + size)
+            # Direct I/O needs the whole aligned buffer; otherwise read just this range
+            target = buffer if self.direct_io else memoryview(buffer)[:size]
+            bytes_read = min(self.read_into(target, absolute_offset - lead) - lead, size)
+            bytes_read = max(0, bytes_read)
+
+            # Drop a trailing partial record if the read came up short
+            return memoryview(buffer)[lead:lead + bytes_read - bytes_read % record_size]
+
+        except Exception as e:
+            logger.error(f"Error reading MFT records {start_record}-{start_record + count - 1}: {e}")
+            return None
+
+    def parse_data_runs(self, runlist):
+        """Decode a non-resident attribute's data runs into (lcn, length) pairs;
+        sparse runs have an lcn of None"""
+        runs = []
+        lcn = 0
+        pos = 0
+        while pos < len(runlist) and runlist[pos] != 0:
+            length_size = runlist[pos] & 0x0F
+            offset_size = runlist[pos] >> 4
+            pos += 1
+            length = int.from_bytes(runlist[pos:pos+length_size], 'little')
+            pos += length_size
+            if offset_size:
+                # LCN offsets are signed and relative to the previous run
+                lcn += int.from_bytes(runlist[pos:pos+offset_size], 'little', signed=True)
+                runs.append((lcn, length))
+            else:
+                runs.append((None, length))
+            pos += offset_size
+        return runs
+
+    def read_nonresident_data(self, record_data, attr_offset):
+        """Read the full contents of a non-resident attribute"""
+        runlist_offset, real_size = NONRESIDENT_HEADER_STRUCT.unpack_from(record_data, attr_offset)
+        attr_length = ATTRIBUTE_HEADER_STRUCT.unpack_from(record_data, attr_offset)[1]
+        runlist = record_data[attr_offset+runlist_offset:attr_offset+attr_length]
+
+        parts = []
+        for lcn, length in self.parse_data_runs(runlist):
+            size = length * self.bytes_per_cluster
+            if lcn is None:
+                parts.append(bytes(size))
+            else:
+                data = bytearray(size)
+                if self.read_into(data, self.partition_offset * SECTOR_SIZE
+                                  + lcn * self.bytes_per_cluster) != size:
+                    raise ValueError(f"Short read of data run at cluster {lcn}")
+                parts.append(data)
+        data = b''.join(parts)
+        if len(data) < real_size:
+            raise ValueError(f"Data runs cover {len(data)} of {real_size} bytes")
+        return data[:real_size]
+
+    def load_mft_bitmap(self):
+        """Load the $BITMAP attribute of $MFT so unused records can be skipped"""
+        self.mft_bitmap = None
+        try:
+            chunk = self.read_mft_chunk(MFT_RECORD_NUMBER, 1)
+            if not chunk or chunk[0:4] != b'FILE' or not self.apply_fixup(chunk):
+                return False
+            record_data = bytes(chunk)
+
+            attr_offset = U16.unpack_from(record_data, 20)[0]
+            while attr_offset + 24 <= len(record_data):
+                (attr_type, attr_length, content_length,
+                 content_offset) = ATTRIBUTE_HEADER_STRUCT.unpack_from(record_data, attr_offset)
+                if attr_type == 0xFFFFFFFF or attr_length == 0:
+                    break
+                if attr_type == 0xB0:  # Bitmap
+                    if record_data[attr_offset+8] == 0:  # Resident
+                        content_offset += attr_offset
+                        self.mft_bitmap = record_data[content_offset:content_offset+content_length]
+                    else:
+                        self.mft_bitmap = self.read_nonresident_data(record_data, attr_offset)
+                    logger.debug("Loaded MFT bitmap covering %d records", len(self.mft_bitmap) * 8)
+                    return True
+                attr_offset += attr_length
+
+            return False
+
+        except Exception as e:
+            logger.warning(f"Error loading MFT bitmap, scanning all records: {e}")
+            self.mft_bitmap = None
+            return False
+
+    def is_mft_range_in_use(self, start_record, count):
+        """Check whether any record in the range is marked in use by the MFT bitmap"""
+        if self.mft_bitmap is None:
+            return True
+        end_byte = (start_record + count + 7) >> 3
+        if end_byte > len(self.mft_bitmap):
+            return True  # Not covered by the bitmap, so scan it
+        # Byte granularity is enough to skip free stretches of the MFT
+        in_use = self.mft_bitmap[start_record >> 3:end_byte]
+        return in_use.count(0) != len(in_use)
+
+    def is_mft_record_in_use(self, record_number):
+        """Check a single record against the MFT bitmap"""
+        if self.mft_bitmap is None:
+            return True
+        byte_index = record_number >> 3
+        if byte_index >= len(self.mft_bitmap):
+            return True  # Not covered by the bitmap, so scan it
+        return bool(self.mft_bitmap[byte_index] >> (record_number & 7) & 1)
+
+    def iter_mft_chunks(self, max_records):
+        """Yield (start_record, chunk) pairs in order while up to MFT_READ_AHEAD
+        further chunk reads are in flight, so disk I/O overlaps with parsing.
+        Chunk buffers are recycled: a chunk is only valid until the next one is
+        requested. A chunk that fails to read is retried one record at a time,
+        so a bad sector only loses the records it holds."""
+        records_per_chunk = max(1, MFT_CHUNK_SIZE // self.mft_record_size)
+        buffer_size = records_per_chunk * self.mft_record_size
+        if self.direct_io:
+            buffer_size += DIRECT_IO_ALIGNMENT  # Room to start at an aligned block
+        free_buffers = []
+
+        def chunk_ranges():
+            for start in range(0, max_records, records_per_chunk):
+                count = min(records_per_chunk, max_records - start)
+                if self.is_mft_range_in_use(start, count):
+                    yield start, count
+
+        # Positional reads can run concurrently; seek+read must stay on one thread
+        workers = MFT_READ_AHEAD if HAVE_PREADV else 1
+        ranges = chunk_ranges()
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            def submit(start, count):
+                buffer = free_buffers.pop() if free_buffers else self.allocate_buffer(buffer_size)
+                future = executor.submit(self.read_mft_chunk, start, count, buffer)
+                pending.append((start, count, buffer, future))
+
+            for start, count in islice(ranges, MFT_READ_AHEAD):
+                submit(start, count)
+
+            while pending:
+                start, count, buffer, future = pending.popleft()
+                chunk = future.result()
+                if chunk is not None and not chunk:
+                    break  # End of the disk
+                next_range = next(ranges, None)
+                if next_range:
+                    submit(*next_range)
+                if chunk is None:
+                    # Read error; salvage whatever records in the range are readable
+                    for record_number in range(start, start + count):
+                        record = self.read_mft_chunk(record_number, 1)
+                        if record:
+                            yield record_number, record
+                else:
+                    yield start, chunk
+                # The caller is done with this chunk; reuse its buffer
+                free_buffers.append(buffer)
+
+    def apply_fixup(self, record_data):
+        """Restore the last two bytes of each sector of a record from its update
+        sequence array, in place. Returns False if the record is torn."""
+        usa_offset, usa_count = FIXUP_HEADER_STRUCT.unpack_from(record_data, 0)
+        if (usa_offset + usa_count * 2 > len(record_data)
+                or (usa_count - 1) * SECTOR_SIZE > len(record_data)):
+            return False
+        
+        # Every sector must end with the update sequence number
+        usn = record_data[usa_offset:usa_offset+2]
+        for i in range(1, usa_count):
+            sector_end = i * SECTOR_SIZE
+            if record_data[sector_end-2:sector_end] != usn:
+                return False
+            record_data[sector_end-2:sector_end] = record_data[usa_offset+2*i:usa_offset+2*i+2]
+        return True
+
     def parse_file_entry(self, record_data, record_number):
         """Parse an MFT record into a file entry"""
         try:
+            # Slice a memoryview so attribute contents are not copied
+            record_data = memoryview(record_data)
             entry = NTFSFileEntry()
             entry.record_number = record_number
 
             # Get the offset to the first attribute
-            attr_offset = struct.unpack('<H', record_data[20:22])[0]
-            # print (attr_offset, 1)
+            attr_offset = U16.unpack_from(record_data, 20)[0]
 
-            # Parse all attributes
-            while attr_offset + 24  <= len(record_data):  # Minimum attribute header size
-                attr_type = struct.unpack('<I', record_data[attr_offset:attr_offset+4])[0]
-                attr_length = struct.unpack('<I', record_data[attr_offset+4:attr_offset+8])[0]
+            # Hoist loop invariants out of the per-attribute walk
+            record_length = len(record_data)
+            unpack_header = ATTRIBUTE_HEADER_STRUCT.unpack_from
+            attribute_parsers = self.attribute_parsers
 
-                content_length = struct.unpack('<I', record_data[attr_offset+16:attr_offset+20])[0]
-                # content_offset += attr_offset
-                content_offset = struct.unpack('<H', record_data[attr_offset+20:attr_offset+22])[0]
+            # Parse all attributes
+            while attr_offset + 24  <= record_length:  # Minimum attribute header size
+                (attr_type, attr_length, content_length,
+                 content_offset) = unpack_header(record_data, attr_offset)
                 content_offset += attr_offset
-                # print (attr_type, attr_length)
                 if attr_type == 0xFFFFFFFF or attr_length == 0:
-                    # print(1)
                     break
                     
                 # Validate attribute length
-                if attr_offset + attr_length > len(record_data):
-                    logger.warning(f"Attribute at offset {attr_offset} exceeds record boundary")
+                if attr_offset + attr_length > record_length:
+                    logger.warning("Attribute at offset %d exceeds record boundary", attr_offset)
                     break
-                # print(record_data[20:22])
-                if (attr_type == 0x30):
-                    print ('content_offset',content_offset)
-                    print ('content_length',content_length)
-                attr_data = record_data[content_offset:content_offset+content_length]
-                # print (attr_data)
-                self.parse_attribute(entry, attr_type, attr_data)
+                parser = attribute_parsers.get(attr_type)
+                if parser:
+                    attr_data = record_data[content_offset:content_offset+content_length]
+                    try:
+                        parser(entry, attr_data)
+                    except Exception as e:
+                        logger.warning("Error parsing attribute %#x: %s", attr_type, e)
+                    else:
+                        entry.add_attribute_type(attr_type)
+                else:
+                    # Nothing to parse; just record the type without slicing it out
+                    entry.add_attribute_type(attr_type)
                 
                 # Move to next attribute
                 attr_offset += attr_length
@@ -224,59 +547,47 @@ class NTFS:
             logger.error(f"Error parsing record {record_number}: {e}")
             return None
         
-    def parse_attribute(self, entry, attr_type, attr_data):
-        # print(attr_type, attr_data[0:8])
-        try:
-            if attr_type == 0x10:  # Standard Information
-                if len(attr_data) >= 48:
-                    entry.created = self.parse_ntfs_time(struct.unpack('<Q', attr_data[24:32])[0])
-                    entry.modified = self.parse_ntfs_time(struct.unpack('<Q', attr_data[32:40])[0])
-                    entry.accessed = self.parse_ntfs_time(struct.unpack('<Q', attr_data[40:48])[0])
-                    
-            elif attr_type == 0x30:  # File Name
-                print(attr_data)
-                if len(attr_data) >= 66:
-                    parent_ref = struct.unpack('<Q', attr_data[0:8])[0]
-                    flags = struct.unpack('<Q', attr_data[56:64])[0]
-                    print('attr',attr_data[0])
-                    name_length = attr_data[64]
-                    # print (name_length)
-                    if 66 + name_length * 2 <= len(attr_data):
-                        try:
-                            name = attr_data[66:66+name_length*2].decode('utf-16le', errors='replace')
-                            # print('name' ,name)
-                            if not entry.name:  # Only set if not already set
-                                entry.name = name
-                            entry.parent_ref = parent_ref
-                            entry.is_directory = bool(flags & 0x10000000)
-                        except UnicodeDecodeError:
-                            logger.warning("Failed to decode filename")
-                            
-            elif attr_type == 0x80:  # Data
-                if len(attr_data) >= 24:
-                    non_resident = attr_data[8]
-                    if non_resident == 0:  # Resident
-                        attr_size = struct.unpack('<I', attr_data[16:20])[0]
-                        entry.size = attr_size
-                    elif len(attr_data) >= 56:  # Non-resident
-                        entry.size = struct.unpack('<Q', attr_data[48:56])[0]
-                        
-            # Record attribute type
-            attr_name = ATTRIBUTE_TYPES.get(attr_type, f'UNKNOWN_{hex(attr_type)}')
-            if attr_name not in entry.attributes:
-                entry.attributes.append(attr_name)
-                
-        except Exception as e:
-            logger.warning(f"Error parsing attribute {hex(attr_type)}: {e}")
+    def parse_standard_information(self, entry, attr_data):
+        """Parse a $STANDARD_INFORMATION (0x10) attribute"""
+        if len(attr_data) >= 48:
+            (entry.created_time, entry.modified_time,
+             entry.accessed_time) = STANDARD_INFORMATION_TIMES_STRUCT.unpack_from(attr_data, 0)
+
+    def parse_file_name(self, entry, attr_data):
+        """Parse a $FILE_NAME (0x30) attribute"""
+        if len(attr_data) >= 66:
+            # Low 48 bits are the parent's record number (top 16 are a sequence number)
+            parent_ref = int.from_bytes(attr_data[0:6], 'little')
+            flags = U64.unpack_from(attr_data, 56)[0]
+            name_length = attr_data[64]
+            namespace = attr_data[65]
+            if 66 + name_length * 2 <= len(attr_data):
+                try:
+                    # Keep the first name, but let a long name replace a DOS 8.3 alias;
+                    # otherwise skip the decode entirely
+                    if not entry.name or (entry.name_namespace == FILE_NAME_NAMESPACE_DOS
+                                          and namespace != FILE_NAME_NAMESPACE_DOS):
+                        # Decode straight from the record buffer, skipping the codec lookup
+                        entry.name = utf16le_decode(attr_data[66:66+name_length*2], 'replace', True)[0]
+                        entry.name_namespace = namespace
+                    entry.parent_ref = parent_ref
+                    entry.is_directory = bool(flags & 0x10000000)
+                except UnicodeDecodeError:
+                    logger.warning("Failed to decode filename")
+
+    def parse_data(self, entry, attr_data):
+        """Parse a $DATA (0x80) attribute"""
+        if len(attr_data) >= 24:
+            non_resident = attr_data[8]
+            if non_resident == 0:  # Resident
+                attr_size = U32.unpack_from(attr_data, 16)[0]
+                entry.size = attr_size
+            elif len(attr_data) >= 56:  # Non-resident
+                entry.size = U64.unpack_from(attr_data, 48)[0]
         
     def parse_ntfs_time(self, ntfs_time):
         """Convert NTFS 64-bit time to Python datetime"""
-        if ntfs_time == 0:
-            return None
-        try:
-            return datetime.datetime(1601, 1, 1) + datetime.timedelta(microseconds=ntfs_time//10)
-        except (OverflowError, ValueError):
-            return None
+        return ntfs_time_to_datetime(ntfs_time)
         
     def scan_files(self, max_files=100):
         """Scan the MFT for files"""
@@ -285,17 +596,32 @@ class NTFS:
                 return False
                 
         self.files = []
+        self.files_by_record = {}
+        self.name_index = None
         valid_records = 0
+        self.load_mft_bitmap()
+        
+        record_size = self.mft_record_size
         
         try:
-            for i in range(0, max_files):
-                record_data, _ = self.read_mft_record(i)
-                if record_data:
-                    entry = self.parse_file_entry(record_data, i)
+            for start, chunk in self.iter_mft_chunks(max_files):
+                for i in range(len(chunk) // record_size):
+                    record_offset = i * record_size
+                    if chunk[record_offset:record_offset+4] != b'FILE':
+                        continue
+                    if not self.is_mft_record_in_use(start + i):
+                        continue
+                    record_data = chunk[record_offset:record_offset+record_size]
+                    if not self.apply_fixup(record_data):
+                        logger.debug("Record %d failed update sequence check", start + i)
+                        continue
+                    entry = self.parse_file_entry(record_data, start + i)
                     if entry:
                         self.files.append(entry)
+                        self.files_by_record[entry.record_number] = entry
                         valid_records += 1
                         
+            self.resolve_parents()
             logger.info(f"Scanned {valid_records} valid files out of {max_files} records")
             return True
             
@@ -305,24 +631,69 @@ class NTFS:
         
     def print_files(self):
         """Print discovered files"""
-        print(f"\nFound {len(self.files)} files:")
-        print("{:<8} {:<50} {:<10} {:<20} {:<10}".format(
-            "Record", "Name", "Size", "Created", "Type"))
-        print("-" * 100)
+        row_format = FILE_ROW_FORMAT.format
+        lines = [
+            f"\nFound {len(self.files)} files:",
+            row_format("Record", "Name", "Size", "Created", "Type"),
+            "-" * 100,
+        ]
         
-        for file in sorted(self.files, key=lambda x: x.record_number):
+        # scan_files appends entries in ascending record order
+        for file in self.files:
             file_type = "DIR" if file.is_directory else "FILE"
-            created_str = file.created.strftime('%Y-%m-%d %H:%M') if file.created else "N/A"
-            print("{:<8} {:<50} {:<10} {:<20} {:<10}".format(
+            created = file.created
+            created_str = created.strftime('%Y-%m-%d %H:%M') if created else "N/A"
+            lines.append(row_format(
                 file.record_number,
                 file.name[:50] if file.name else "N/A",
                 file.size,
                 created_str,
                 file_type))
+        
+        # One write for the whole listing instead of one print per row
+        lines.append("")
+        sys.stdout.write("\n".join(lines))
+
+    def resolve_parents(self):
+        """Fill in parent_name for every scanned file once the whole MFT is read,
+        so a parent stored after its children still resolves"""
+        for entry in self.files:
+            if entry.parent_ref == ROOT_RECORD_NUMBER:
+                entry.parent_name = self.root_name
+            else:
+                parent = self.get_parent(entry)
+                entry.parent_name = parent.name if parent else None
+
+    def get_parent(self, entry):
+        """Return the scanned entry of a file's parent directory, if any"""
+        return self.files_by_record.get(entry.parent_ref)
+
+    def build_name_index(self):
+        """Index every three-character slice of each lowercase file name"""
+        index = defaultdict(list)
+        for position, entry in enumerate(self.files):
+            if not entry.name:
+                continue
+            name = entry.name.lower()
+            for trigram in {name[i:i+3] for i in range(len(name) - 2)}:
+                index[trigram].append(position)
+        self.name_index = index
 
     def find_file(self, name):
         """Find a file by name (case insensitive)"""
-        return [f for f in self.files if f.name and name.lower() in f.name.lower()]
+        query = name.lower()
+        if len(query) < 3:
+            return [f for f in self.files if f.name and query in f.name.lower()]
+        
+        if self.name_index is None:
+            self.build_name_index()
+        
+        # A match must contain every trigram of the query; confirm the substring
+        postings = sorted((self.name_index.get(query[i:i+3], ())
+                           for i in range(len(query) - 2)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return [self.files[position] for position in sorted(candidates)
+                if query in self.files[position].name.lower()]
 
 def check_filesystem(disk_path):
     """Check if the specified path is an NTFS volume"""